@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+SHARED ENVIRONMENT VERIFICATION CHECKS
+======================================
+
+The checks behind verify_setup.py and ultimate_verification.py:
+- Python version and required packages
+- .env discovery and API key status
+- Concurrent API connection probes with a short-lived health cache
+
+Both scripts import this module, so its caches are shared when they run
+in the same session.
+
+Each check prints to an optional out stream (stdout by default), so
+callers can collect a section's output and write it in one go.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import importlib.util
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# pip distribution names whose import name differs
+IMPORT_NAMES = {
+    'python-dotenv': 'dotenv',
+    'google-generativeai': 'google.generativeai'
+}
+
+# SDK each API probe needs
+PROVIDER_SDKS = {
+    'openai': 'openai',
+    'claude': 'anthropic',
+    'google': 'google.generativeai'
+}
+
+# Environment variable holding each provider's key
+PROVIDER_ENV_VARS = {
+    'openai': 'OPENAI_API_KEY',
+    'claude': 'CLAUDE_API_KEY',
+    'google': 'GOOGLE_API_KEY',
+    'llama': 'LLAMA_API_KEY'
+}
+
+# Template value from the sample .env that is not a real key
+PLACEHOLDER_KEY = "your-openai-key-here"
+
+# Llama API keys look like LLM|<app id>|<secret>
+LLAMA_KEY_PREFIXES = ('LLM|',)
+
+# Claude model list, queried directly when the anthropic SDK predates models.list
+CLAUDE_MODELS_URL = "https://api.anthropic.com/v1/models"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# Places to look for the .env file, in order; DOTENV_PATH overrides
+ENV_PATHS = tuple(filter(None, [
+    os.environ.get('DOTENV_PATH'),
+    '.env',
+    str(Path.home() / '.env')
+]))
+
+# ${VAR} references need python-dotenv's full parser
+ENV_INTERPOLATION = re.compile(r'\$\{\w+\}')
+
+# Probe outcomes from this session, keyed by (provider, api key)
+_probe_results = {}
+
+# Provider SDKs imported so far, by import name
+_sdk_modules = {}
+
+# Providers that passed a live test are not re-tested for this many
+# seconds (across runs) unless --force is given
+HEALTH_CACHE_FILE = Path.home() / '.cache' / 'ultimate_verification' / 'health.json'
+HEALTH_CACHE_TTL = 300
+
+@functools.lru_cache(maxsize=None)
+def _has_pkg(name):
+    """Check whether a package is importable, looking each name up only once"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        # Parent of a dotted name (e.g. google) is missing
+        return False
+
+def _lazy(name):
+    """Import a provider SDK the first time a probe needs it"""
+    module = _sdk_modules.get(name)
+    if module is None:
+        module = _sdk_modules[name] = importlib.import_module(name)
+    return module
+
+def _load_env(path):
+    """Load KEY=value lines from a .env file, keeping variables already set"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    
+    if ENV_INTERPOLATION.search(text):
+        from dotenv import load_dotenv
+        load_dotenv(path)
+        return
+    
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, _, value = line.partition('=')
+        key = key.strip()
+        if key.startswith('export '):
+            key = key[len('export '):].strip()
+        
+        # Same rules as python-dotenv: a quoted value ends at its closing
+        # quote, an unquoted one at the first " #" comment
+        value = value.strip()
+        if value[:1] in ('"', "'") and value[0] in value[1:]:
+            value = value[1:value.index(value[0], 1)]
+        else:
+            value = re.split(r'\s+#', value, maxsplit=1)[0]
+        os.environ.setdefault(key, value)
+
+@functools.lru_cache(maxsize=1)
+def _ensure_env_loaded():
+    """Load the first .env file found, once per process; returns its path"""
+    env_file_path = next((path for path in ENV_PATHS if Path(path).is_file()), None)
+    if env_file_path is not None:
+        _load_env(env_file_path)
+    return env_file_path
+
+def _mask(value):
+    """Show just the ends of a secret"""
+    if len(value) > 20:
+        return f"{value[:8]}...{value[-8:]}"
+    return f"{value[:6]}...{value[-6:]}"
+
+def _short_err(error, n=60):
+    """First n characters of an error message, without formatting all of it
+    
+    Errors that build their own text (google.api_core prefixes the HTTP
+    code in __str__) are formatted in full so nothing is lost.
+    """
+    plain = type(error).__str__ is BaseException.__str__
+    if plain and error.args and isinstance(error.args[0], str):
+        message = error.args[0]
+    else:
+        message = str(error) or repr(error)
+    return message[:n] + "..." if len(message) > n else message
+
+def _key_fingerprint(key):
+    """Identify an API key without storing it"""
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+def flush_output(out):
+    """Write everything buffered in out to stdout in one call and reset it"""
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+    out.seek(0)
+    out.truncate()
+
+def run_checks(checks, out=None):
+    """Run independent checks concurrently and return their results in order
+    
+    Each check gets its own buffer, so output is written to out in the
+    order the checks are listed, not the order they finish.
+    """
+    buffers = [io.StringIO() for _ in checks]
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [executor.submit(check, buffer) for check, buffer in zip(checks, buffers)]
+        results = [future.result() for future in futures]
+    
+    for buffer in buffers:
+        print(buffer.getvalue(), end="", file=out)
+    return results
+
+def check_python(out=None):
+    """Check Python version compatibility"""
+    version = sys.version_info
+    print(f"🐍 Python Version: {version.major}.{version.minor}.{version.micro}", file=out)
+    
+    if version.major >= 3 and version.minor >= 8:
+        print("   ✅ Python version is compatible", file=out)
+        return True
+    else:
+        print("   ❌ Python 3.8+ required", file=out)
+        return False
+
+def check_packages(required, width=25, out=None):
+    """Check that every package in required (pip name -> description) is installed"""
+    
+    print(f"\n📦 Checking Required Packages:", file=out)
+    print("-" * (width + 15), file=out)
+    
+    missing_packages = []
+    
+    for package, description in required.items():
+        if _has_pkg(IMPORT_NAMES.get(package, package)):
+            print(f"✅ {package:<{width}}: Available", file=out)
+        else:
+            print(f"❌ {package:<{width}}: Missing", file=out)
+            missing_packages.append(package)
+    
+    if missing_packages:
+        print(f"\n💡 To install missing packages:", file=out)
+        print(f"pip install {' '.join(missing_packages)}", file=out)
+        return False
+    else:
+        print(f"\n🎉 All required packages are installed!", file=out)
+        return True
+
+def load_env_file(out=None):
+    """Find and load the .env file, reporting where it was found"""
+    try:
+        env_file_path = _ensure_env_loaded()
+    except ImportError:
+        print("❌ python-dotenv not available", file=out)
+        return False
+    
+    if env_file_path is None:
+        print("❌ .env file not found", file=out)
+        print("💡 Create .env file with your API keys", file=out)
+        return False
+    print(f"✅ Found .env file at: {env_file_path}", file=out)
+    return True
+
+def check_keys(required, masked=False, out=None):
+    """Report which API keys in required (variable -> description) are set
+    
+    masked=True labels keys by description and shows their ends; otherwise
+    keys are labelled by variable name only. Returns the number configured.
+    """
+    configured_keys = 0
+    env = dict(os.environ)
+    
+    for var_name, description in required.items():
+        label = description if masked else var_name
+        value = env.get(var_name)
+        if value and value != PLACEHOLDER_KEY:
+            print(f"✅ {label:<25}: {_mask(value) if masked else 'Configured'}", file=out)
+            configured_keys += 1
+        else:
+            print(f"❌ {label:<25}: Missing or placeholder", file=out)
+    
+    return configured_keys
+
+async def probe_openai(api_key):
+    """List OpenAI models, which checks the key without running a model"""
+    openai = _lazy('openai')
+    
+    async with openai.AsyncOpenAI(api_key=api_key) as client:
+        await client.models.list()
+
+async def probe_claude(api_key):
+    """List one Claude model, which checks the key without running a model"""
+    anthropic = _lazy('anthropic')
+    
+    client = anthropic.AsyncAnthropic(api_key=api_key)
+    if hasattr(client, 'models'):
+        async with client:
+            await client.models.list(limit=1)
+        return
+    
+    # Older SDKs have no models API; ask the endpoint directly over the
+    # httpx that anthropic itself depends on
+    await client.close()
+    httpx = _lazy('httpx')
+    async with httpx.AsyncClient(timeout=30.0) as http:
+        response = await http.get(CLAUDE_MODELS_URL, params={'limit': 1}, headers={
+            'x-api-key': api_key,
+            'anthropic-version': ANTHROPIC_VERSION
+        })
+        response.raise_for_status()
+
+async def probe_gemini(api_key):
+    """List one Gemini model, which checks the key without running a model"""
+    genai = _lazy('google.generativeai')
+    
+    # list_models has no async form, so fetch its first page off the loop
+    genai.configure(api_key=api_key)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, lambda: next(iter(genai.list_models(page_size=1)), None))
+
+async def probe_llama(api_key):
+    """Check the Llama key format (no network call)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, api_key.startswith, LLAMA_KEY_PREFIXES)
+
+# Probe for each provider
+PROBES = {
+    'openai': probe_openai,
+    'claude': probe_claude,
+    'google': probe_gemini,
+    'llama': probe_llama
+}
+
+async def gather_probes(probes):
+    """Run the probes concurrently; a failed probe returns its exception"""
+    return await asyncio.gather(*probes, return_exceptions=True)
+
+def _run_gather(probes):
+    """Run gather_probes to completion from synchronous code
+    
+    asyncio.run refuses to start inside a running event loop (Jupyter,
+    IPython), so in that case the probes get a fresh loop on a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(gather_probes(probes))
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, gather_probes(probes)).result()
+
+def run_probes(probes, force=False):
+    """Run probes concurrently, reusing outcomes already seen this session
+    
+    probes maps a provider to (api_key, probe function); force=True runs
+    every probe again. Returns the outcome for every provider and the list
+    of providers that were actually probed this time.
+    """
+    pending = {provider: probe for provider, (key, probe) in probes.items()
+               if force or (provider, key) not in _probe_results}
+    if pending:
+        outcomes = _run_gather([probe() for probe in pending.values()])
+        for provider, outcome in zip(pending, outcomes):
+            _probe_results[(provider, probes[provider][0])] = outcome
+    
+    results = {provider: _probe_results[(provider, key)] for provider, (key, _) in probes.items()}
+    return results, list(pending)
+
+def _read_health():
+    """Read the raw health cache, or {} if it is missing or unreadable"""
+    try:
+        with open(HEALTH_CACHE_FILE, encoding='utf-8') as f:
+            health = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return health if isinstance(health, dict) else {}
+
+def _load_cached_health(ttl=HEALTH_CACHE_TTL):
+    """Providers that passed within the last ttl seconds, mapped to their key fingerprint"""
+    now = time.time()
+    return {provider: entry.get('key_id') for provider, entry in _read_health().items()
+            if isinstance(entry, dict) and now - entry.get('checked_at', 0) < ttl}
+
+def _save_health(outcomes):
+    """Record live probe outcomes; passes are stamped, failures are dropped
+    
+    outcomes maps a provider to (api_key, outcome).
+    """
+    if not outcomes:
+        return
+    
+    health = _read_health()
+    now = time.time()
+    for provider, (key, outcome) in outcomes.items():
+        if isinstance(outcome, Exception):
+            health.pop(provider, None)
+        else:
+            health[provider] = {'key_id': _key_fingerprint(key), 'checked_at': now}
+    
+    # Write to a temp file and swap it in so readers never see half a file
+    try:
+        HEALTH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = HEALTH_CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(health, f)
+        os.replace(tmp_path, HEALTH_CACHE_FILE)
+    except OSError:
+        pass  # The cache is only an optimization
+
+def probe_providers(labels, force=False, out=None):
+    """Test every configured provider in labels (provider -> display name)
+    
+    All probes run at once. Providers that passed within HEALTH_CACHE_TTL
+    seconds are reported from the health cache; force=True tests everything
+    live. Returns the number of working providers, or False if the
+    environment could not be loaded.
+    """
+    
+    # Load environment
+    try:
+        _ensure_env_loaded()
+    except ImportError:
+        print("❌ Cannot load environment variables", file=out)
+        return False
+    
+    # Queue a probe for every configured provider
+    probes = {}
+    for provider in labels:
+        key = os.getenv(PROVIDER_ENV_VARS[provider])
+        if key and key != PLACEHOLDER_KEY:
+            probes[provider] = (key, functools.partial(PROBES[provider], key))
+    
+    # Providers whose SDK is missing are reported without importing anything
+    not_installed = [provider for provider in probes
+                     if provider in PROVIDER_SDKS and not _has_pkg(PROVIDER_SDKS[provider])]
+    for provider in not_installed:
+        del probes[provider]
+    
+    # Skip providers whose current key passed recently
+    healthy = {} if force else _load_cached_health()
+    cached = [provider for provider in PROVIDER_SDKS
+              if provider in probes and healthy.get(provider) == _key_fingerprint(probes[provider][0])]
+    live = {provider: probe for provider, probe in probes.items() if provider not in cached}
+    
+    # Only probes that really ran are recorded; a session-cached outcome
+    # must not be stamped as a fresh check
+    results, probed = run_probes(live, force)
+    _save_health({provider: (live[provider][0], results[provider])
+                  for provider in probed if provider in PROVIDER_SDKS})
+    results.update(dict.fromkeys(cached, True))
+    
+    if cached:
+        print(f"💾 Recently verified: {', '.join(cached)} (run with --force to retest)", file=out)
+    
+    # Report in a fixed order, whichever probe finished first
+    working = 0
+    for provider, label in labels.items():
+        if provider in not_installed:
+            print(f"⚠️  {label}: {PROVIDER_SDKS[provider]} not installed", file=out)
+        elif provider not in results:
+            print(f"⚠️  {label}: Key not configured", file=out)
+        elif provider == 'llama':
+            # Llama is only checked for key format
+            if results[provider] is True:
+                print(f"✅ {label}: Key format verified", file=out)
+                working += 1
+            else:
+                print(f"⚠️  {label}: Unusual key format", file=out)
+        elif isinstance(results[provider], Exception):
+            print(f"❌ {label}: {_short_err(results[provider])}", file=out)
+        else:
+            print(f"✅ {label}: Connection successful", file=out)
+            working += 1
+    
+    return working
@@ -17,71 +17,520 @@ The most comprehensive prompt engineering platform with access to:
 """
 
 import os
-import sys
-import requests
+import re
+import asyncio
+import importlib.util
 import json
-from typing import Dict, Optional, List, Any
-
-# Install and import required libraries
-def ensure_package(package_name, import_name=None):
-    """Ensure a package is installed and import it"""
-    import_name = import_name or package_name
-    try:
-        __import__(import_name)
-        return True
-    except ImportError:
-        print(f"📦 Installing {package_name}...")
-        import subprocess
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package_name])
-        return True
-
-# Ensure required packages
-required_packages = [
-    ('python-dotenv', 'dotenv'),
-    ('openai', 'openai'),
-    ('google-generativeai', 'google.generativeai'),
-    ('anthropic', 'anthropic'),
-    ('requests', 'requests')
-]
+import logging
+import sys
+import time
+import hashlib
+import functools
+import inspect
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, List, Sequence, Tuple, Any
 
-print("🔧 Checking required packages...")
-for package, import_name in required_packages:
-    ensure_package(package, import_name)
+# Core dependencies; provider SDKs are imported lazily on first use
+try:
+    import requests
+    from dotenv import load_dotenv
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError as e:
+    raise ImportError(
+        f"{e.name} is not installed. Install the platform's dependencies with: "
+        "pip install -r requirements.txt"
+    ) from e
 
-# Now import everything
-from dotenv import load_dotenv
-import anthropic
+# orjson is several times faster than the stdlib for Llama payloads; both
+# helpers work on bytes so the HTTP layer can send/receive them untouched
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 # Load environment variables
 load_dotenv()
 
+# Console output for the platform; messages are plain text on stdout so they
+# stay in line with streamed responses. Pass quiet=True to keep only warnings.
+# A level the application already configured is left alone.
+logger = logging.getLogger("ultimate4")
+if logger.level == logging.NOTSET:
+    logger.setLevel(logging.INFO)
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+# Directory for the optional persistent response cache (needs diskcache)
+RESPONSE_CACHE_DIR = "./.llm_cache"
+
+# Llama chat completions endpoint (plain HTTPS, no SDK)
+LLAMA_API_URL = "https://api.llama.com/v1/chat/completions"
+
+# Cooldown (seconds) for a rate-limited key when the provider gives no
+# Retry-After hint; doubles with each consecutive rate limit up to the cap
+DEFAULT_KEY_COOLDOWN = 60.0
+MAX_KEY_COOLDOWN = 300.0
+
+# HTTP statuses that take a key out of rotation: rejected keys are dropped,
+# throttled keys cool down. 5xx responses just move on to the next key.
+KEY_REJECTED_STATUSES = (401, 402, 403)
+KEY_THROTTLED_STATUSES = (408, 429)
+
+# Gemini reports a bad or expired API key as 400 InvalidArgument; these
+# markers (ErrorInfo reason or message text) identify it as a key rejection
+GOOGLE_KEY_ERROR_MARKERS = ("API_KEY_INVALID", "API key not valid", "API key expired")
+
+# Template values from the sample .env that are not real keys
+PLACEHOLDER_KEYS = ("your-openai-key-here",)
+
+# Gemini model names to try, newest first, until one works for a key
+GOOGLE_MODEL_NAMES = (
+    'gemini-1.5-pro-latest',
+    'gemini-1.5-pro',
+    'gemini-pro',
+    'gemini-1.0-pro'
+)
+
+# Last working Google (key fingerprint, model) pair, so later runs skip
+# model discovery. Keys are stored as hashes, never in plain text.
+GOOGLE_STATE_FILE = Path.home() / ".cache" / "ultimate4model" / "google.json"
+
+# Claude model used for chat and batch requests
+CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+
+# Llama model served by LLAMA_API_URL
+LLAMA_MODEL = "Llama-4-Maverick-17B-128E-Instruct-FP8"
+
+# Completion length requested from every provider
+MAX_OUTPUT_TOKENS = 400
+
+# Context window (tokens) per model, used to reject over-long prompts
+# before paying for them; models not listed here are not checked
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    CLAUDE_MODEL: 200000,
+    LLAMA_MODEL: 128000,
+    "gemini-1.5-pro-latest": 2097152,
+    "gemini-1.5-pro": 2097152,
+    "gemini-pro": 32760,
+    "gemini-1.0-pro": 32760
+}
+
+# Batch API jobs are polled at this interval (seconds) until they finish
+BATCH_POLL_INTERVAL = 30.0
+
+# OpenAI models served by the legacy completions endpoint, which accepts a
+# list of prompts in a single request
+OPENAI_COMPLETION_MODELS = ("gpt-3.5-turbo-instruct", "davinci-002", "babbage-002")
+
+# Upper bound on concurrent requests per provider for batched prompts
+BATCH_MAX_WORKERS = 8
+
+# Display labels per provider for connection tests and comparisons
+TEST_LABELS = {
+    'openai': "OpenAI GPT-4",
+    'claude': "Claude Sonnet",
+    'google': "Google Gemini",
+    'llama': "Meta Llama"
+}
+COMPARE_LABELS = {
+    'openai': "🧠 OpenAI GPT-4",
+    'claude': "🎭 Claude Sonnet",
+    'google': "🔍 Google Gemini",
+    'llama': "🦙 Meta Llama"
+}
+
+
+def _response_cache_key(provider: str, signature: inspect.Signature, args, kwargs) -> tuple:
+    """Cache key for a provider call: the provider plus every call argument"""
+    
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (provider,) + tuple(
+        value for name, value in bound.arguments.items() if name != 'self'
+    )
+
+
+def cached_response(provider: str):
+    """Serve repeat prompts for a provider from the platform's response cache
+
+    The cache key is the provider plus every argument of the wrapped method
+    (prompt, system prompt, model...). Pass ``no_cache=True`` to force a
+    live API call. Error responses and non-text results are never cached.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, no_cache: bool = False, **kwargs):
+            if no_cache:
+                return method(self, *args, **kwargs)
+            
+            key = _response_cache_key(provider, signature, (self,) + args, kwargs)
+            
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+            
+            response = method(self, *args, **kwargs)
+            # Providers can return None (e.g. an OpenAI refusal); only cache text
+            if isinstance(response, str) and not response.startswith("❌"):
+                self._cache_set(key, response)
+            return response
+        
+        return wrapper
+    return decorator
+
+
+def cached_stream(provider: str):
+    """Streaming counterpart of cached_response, sharing the same cache
+    
+    A cached response is replayed as a single chunk; a live stream is stored
+    once it has finished without errors.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, no_cache: bool = False, **kwargs):
+            if no_cache:
+                yield from method(self, *args, **kwargs)
+                return
+            
+            key = _response_cache_key(provider, signature, (self,) + args, kwargs)
+            
+            cached = self._cache_get(key)
+            if cached is not None:
+                yield cached
+                return
+            
+            chunks = []
+            for chunk in method(self, *args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+            
+            if chunks and not any(chunk.startswith("❌") for chunk in chunks):
+                self._cache_set(key, "".join(chunks))
+        
+        return wrapper
+    return decorator
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract a provider's retry hint (in seconds) from a rate-limit error"""
+    
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers:
+        try:
+            return float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            pass
+    
+    # Google errors carry a RetryInfo detail instead of a header
+    for detail in getattr(error, 'details', None) or []:
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    
+    return None
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    """Return the HTTP status behind an SDK or requests exception, if any"""
+    
+    # openai/anthropic use status_code, google.api_core uses code
+    for attr in ('status_code', 'code'):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            status = int(status)
+            if status == 400 and _is_google_key_error(error):
+                return 401
+            return status
+    
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def _is_google_key_error(error: Exception) -> bool:
+    """Whether a Gemini 400 error is really a rejected API key"""
+    
+    text = f"{getattr(error, 'reason', None) or ''} {error}"
+    return any(marker in text for marker in GOOGLE_KEY_ERROR_MARKERS)
+
+
+def _is_failover_status(status: Optional[int]) -> bool:
+    """Whether an HTTP status should move a call on to the next key"""
+    
+    if status is None:
+        return False
+    return status in KEY_REJECTED_STATUSES or status in KEY_THROTTLED_STATUSES or status >= 500
+
+
+def _discover_keys(prefix: str, *aliases: str) -> List[str]:
+    """Collect a provider's keys from PREFIX, PREFIX_1, PREFIX_2, ... and aliases
+    
+    Each variable may also hold several comma-separated keys. Duplicates and
+    placeholder values are dropped; order follows the variable numbering.
+    """
+    
+    pattern = re.compile(rf"{re.escape(prefix)}(?:_(\d+))?")
+    numbered = []
+    for name, value in os.environ.items():
+        match = pattern.fullmatch(name)
+        if match:
+            numbered.append((int(match.group(1) or 0), value))
+    
+    values = [value for _, value in sorted(numbered)]
+    values += [os.environ.get(alias, "") for alias in aliases]
+    
+    keys = []
+    for value in values:
+        for key in value.split(","):
+            key = key.strip()
+            if key and key not in PLACEHOLDER_KEYS and key not in keys:
+                keys.append(key)
+    return keys
+
+
+@dataclass(frozen=True, repr=False)
+class PlatformConfig:
+    """API keys for every provider, read from the environment once"""
+    
+    # Explicit slots (not slots=True) keep this working on Python 3.8/3.9
+    __slots__ = ('openai_keys', 'claude_keys', 'google_keys', 'llama_keys')
+    
+    openai_keys: Tuple[str, ...]
+    claude_keys: Tuple[str, ...]
+    google_keys: Tuple[str, ...]
+    llama_keys: Tuple[str, ...]
+    
+    @classmethod
+    def from_env(cls) -> "PlatformConfig":
+        """Discover all provider keys (PROVIDER_API_KEY, PROVIDER_API_KEY_1, ...)"""
+        
+        return cls(
+            openai_keys=tuple(_discover_keys('OPENAI_API_KEY')),
+            claude_keys=tuple(_discover_keys('CLAUDE_API_KEY')),
+            google_keys=tuple(_discover_keys(
+                'GOOGLE_API_KEY', 'GOOGLE_API_KEY_BACKUP', 'GOOGLE_API_KEY_BACKUP2'
+            )),
+            llama_keys=tuple(_discover_keys('LLAMA_API_KEY'))
+        )
+    
+    def __repr__(self):
+        # Never echo raw keys into logs or notebook output
+        counts = ", ".join(f"{name}={len(getattr(self, name))}" for name in self.__slots__)
+        return f"PlatformConfig({counts})"
+
+
+class KeyPoolExhausted(RuntimeError):
+    """Raised when every key in a provider's pool is rate-limited or rejected"""
+
+
+class KeyPool:
+    """Rotating pool of API keys for one provider
+    
+    Each key is ``available``, ``rate_limited`` until its cooldown expires,
+    or ``errored`` once the provider has rejected it. Calls use the first
+    available key (fill-first) and fail over to the next one on auth, quota
+    or server errors. Clients are built by ``factory`` on first use, so a
+    provider's SDK is only imported when it is actually called.
+    """
+    
+    def __init__(self, provider: str, keys: Sequence[str], factory: Callable[[str], Any]):
+        self.provider = provider
+        self.factory = factory
+        self.enabled = False
+        self.entries = [
+            {"key": k, "state": "available", "cooldown_until": 0.0, "throttles": 0, "uses": 0}
+            for k in keys
+        ]
+        self.active = None
+        self.client = None
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def next_available(self, exclude: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """Return the first key whose cooldown has expired"""
+        
+        now = time.time()
+        for entry in self.entries:
+            if entry["state"] == "errored" or any(entry is e for e in exclude or ()):
+                continue
+            if entry["state"] == "rate_limited":
+                if entry["cooldown_until"] > now:
+                    continue
+                entry["state"] = "available"
+            return entry
+        return None
+    
+    def activate(self, entry: Optional[Dict[str, Any]] = None, client: Any = None) -> Any:
+        """Make a key the active one, building its client unless one is given"""
+        
+        with self._lock:
+            entry = entry or self.next_available()
+            if entry is None:
+                raise KeyPoolExhausted(f"No usable {self.provider} API keys")
+            self.client = client if client is not None else self.factory(entry["key"])
+            self.active = entry
+            return self.client
+    
+    def acquire(self, exclude: Optional[List[Dict[str, Any]]] = None):
+        """Return the (key entry, client) to use next, switching keys if needed"""
+        
+        with self._lock:
+            entry = self.next_available(exclude)
+            if entry is None:
+                return None, None
+            if entry is not self.active:
+                self.client = self.factory(entry["key"])
+                self.active = entry
+            return entry, self.client
+    
+    def fail(self, entry: Dict[str, Any], error: Exception, status: int):
+        """Take a key out of rotation after the provider refused a call"""
+        
+        with self._lock:
+            if status in KEY_REJECTED_STATUSES:
+                entry["state"] = "errored"
+            elif status in KEY_THROTTLED_STATUSES:
+                cooldown = _retry_after_seconds(error)
+                if cooldown is None:
+                    cooldown = min(DEFAULT_KEY_COOLDOWN * (2 ** entry["throttles"]), MAX_KEY_COOLDOWN)
+                entry["state"] = "rate_limited"
+                entry["cooldown_until"] = time.time() + cooldown
+                entry["throttles"] += 1
+    
+    def execute_with_failover(self, call: Callable[[Any], Any]) -> Any:
+        """Run ``call(client)``, retrying on the next key when one is refused"""
+        
+        tried = []
+        last_error = None
+        
+        for _ in range(len(self.entries)):
+            entry, client = self.acquire(exclude=tried)
+            if entry is None:
+                break
+            
+            try:
+                result = call(client)
+            except Exception as e:
+                status = _error_status(e)
+                if not _is_failover_status(status):
+                    raise
+                self.fail(entry, e, status)
+                tried.append(entry)
+                last_error = e
+                continue
+            
+            entry["uses"] += 1
+            entry["throttles"] = 0
+            return result
+        
+        if last_error is not None:
+            raise last_error
+        raise KeyPoolExhausted(f"No usable {self.provider} API keys")
+    
+    async def execute_with_failover_async(self, call: Callable[[str], Any]) -> Any:
+        """Async variant of execute_with_failover; ``call`` receives the raw key"""
+        
+        tried = []
+        last_error = None
+        
+        for _ in range(len(self.entries)):
+            with self._lock:
+                entry = self.next_available(tried)
+            if entry is None:
+                break
+            
+            try:
+                result = await call(entry["key"])
+            except Exception as e:
+                status = _error_status(e)
+                if not _is_failover_status(status):
+                    raise
+                self.fail(entry, e, status)
+                tried.append(entry)
+                last_error = e
+                continue
+            
+            entry["uses"] += 1
+            entry["throttles"] = 0
+            return result
+        
+        if last_error is not None:
+            raise last_error
+        raise KeyPoolExhausted(f"No usable {self.provider} API keys")
+
 
 class ImprovedUltimate4ModelPlatform:
     """Improved ultimate 4-model prompt engineering platform"""
     
-    def __init__(self):
-        """Initialize with all 4 major AI providers + improved Google handling"""
-        
-        print("🌟 IMPROVED ULTIMATE 4-MODEL PROMPT ENGINEERING PLATFORM")
-        print("=" * 75)
-        print("Enhanced: OpenAI • Meta Llama • Google Gemini • Anthropic Claude")
-        print("=" * 75)
-        
-        # Load API keys (including multiple Google keys)
-        self.openai_key = os.getenv('OPENAI_API_KEY')
-        self.llama_key = os.getenv('LLAMA_API_KEY')
-        self.google_keys = [
-            os.getenv('GOOGLE_API_KEY'),
-            os.getenv('GOOGLE_API_KEY_BACKUP'), 
-            os.getenv('GOOGLE_API_KEY_BACKUP2')
-        ]
-        self.google_keys = [k for k in self.google_keys if k]  # Remove None values
-        self.claude_key = os.getenv('CLAUDE_API_KEY')
+    def __init__(self, config: Optional[PlatformConfig] = None, quiet: Optional[bool] = None):
+        """Initialize with all 4 major AI providers + improved Google handling
+        
+        Keys come from the environment unless a PlatformConfig is passed in.
+        quiet=True limits console output to warnings and failures and
+        quiet=False restores it; by default the logger level is untouched.
+        """
+        
+        if quiet is not None:
+            logger.setLevel(logging.WARNING if quiet else logging.INFO)
+        
+        logger.info("🌟 IMPROVED ULTIMATE 4-MODEL PROMPT ENGINEERING PLATFORM")
+        logger.info("=" * 75)
+        logger.info("Enhanced: OpenAI • Meta Llama • Google Gemini • Anthropic Claude")
+        logger.info("=" * 75)
+        
+        # Load API keys once, then back each provider with a rotating key pool
+        self.cfg = config or PlatformConfig.from_env()
+        self._pools = {
+            'openai': KeyPool('openai', self.cfg.openai_keys, self._make_openai_client),
+            'claude': KeyPool('claude', self.cfg.claude_keys, self._make_claude_client),
+            'google': KeyPool('google', self.cfg.google_keys, self._make_google_model),
+            'llama': KeyPool('llama', self.cfg.llama_keys, self._make_llama_session)
+        }
+        
+        # System-prompt message prefixes, built once per distinct system prompt
+        self._prefix_cache = {}
+        
+        # tiktoken encoding for prompt-length checks (loaded on first use;
+        # False when tiktoken is unavailable)
+        self._encoding = None
         
-        # Track active keys and clients
-        self.active_google_key = None
+        # Async Llama client, bound to the event loop that created it
+        self._llama_async = None
+        self._llama_async_loop = None
+        
+        # Track the working Gemini model name (found on the first call)
         self.active_google_model = None
-        self.clients = {}
+        self._google_discovery_lock = threading.Lock()
+        
+        # Response cache: in-memory, plus on-disk when diskcache is installed
+        self._cache = {}
+        self._disk_cache = None
+        try:
+            import diskcache
+            self._disk_cache = diskcache.Cache(RESPONSE_CACHE_DIR)
+        except ImportError:
+            pass
         
         # Display key status
         self.check_all_api_keys()
@@ -89,217 +538,487 @@ class ImprovedUltimate4ModelPlatform:
         # Initialize all clients
         self.setup_all_clients()
         
+        # Response methods of the providers that set up successfully, built
+        # once so test/compare loops only ever call usable providers
+        self._dispatch: Tuple[Tuple[str, Callable[..., str]], ...] = tuple(
+            (name, func) for name, func in (
+                ('openai', self.get_openai_response),
+                ('claude', self.get_claude_response),
+                ('google', self.get_google_response),
+                ('llama', self.get_llama_response)
+            ) if self._pools[name].enabled
+        )
+        
+        # Streaming counterparts of the dispatch table, in the same order
+        streams = {
+            'openai': self.get_openai_response_stream,
+            'claude': self.get_claude_response_stream,
+            'google': self.get_google_response_stream,
+            'llama': self.get_llama_response_stream
+        }
+        self._stream_dispatch: Tuple[Tuple[str, Callable[..., Iterator[str]]], ...] = tuple(
+            (name, streams[name]) for name, _ in self._dispatch
+        )
+        
         # Display final status
         self.display_platform_status()
     
     def check_all_api_keys(self):
         """Check and display all API key statuses"""
         
-        print("\n🔐 Enhanced API Key Status Check:")
-        print("-" * 45)
+        logger.info("\n🔐 Enhanced API Key Status Check:")
+        logger.info("-" * 45)
         
         keys_status = {
-            "OpenAI GPT": self.openai_key and self.openai_key != "your-openai-key-here",
-            "Meta Llama": bool(self.llama_key),
-            "Google Gemini": len(self.google_keys) > 0,
-            "Anthropic Claude": bool(self.claude_key)
+            "OpenAI GPT": len(self._pools['openai']),
+            "Meta Llama": len(self._pools['llama']),
+            "Google Gemini": len(self._pools['google']),
+            "Anthropic Claude": len(self._pools['claude'])
         }
         
         working_keys = 0
-        for service, has_key in keys_status.items():
-            status = "✅" if has_key else "❌"
-            if service == "Google Gemini" and has_key:
-                print(f"{status} {service} ({len(self.google_keys)} keys available)")
+        for service, key_count in keys_status.items():
+            status = "✅" if key_count else "❌"
+            if key_count > 1:
+                logger.info("%s %s (%s keys available)", status, service, key_count)
             else:
-                print(f"{status} {service}")
-            if has_key:
+                logger.info("%s %s", status, service)
+            if key_count:
                 working_keys += 1
         
-        print(f"\n📊 {working_keys}/4 AI providers configured")
+        logger.info("\n📊 %s/4 AI providers configured", working_keys)
         
         if working_keys == 4:
-            print("🎉 PERFECT! All 4 AI providers configured!")
+            logger.info("🎉 PERFECT! All 4 AI providers configured!")
         elif working_keys >= 3:
-            print("🔥 EXCELLENT! Multiple AI providers configured!")
+            logger.info("🔥 EXCELLENT! Multiple AI providers configured!")
         elif working_keys >= 2:
-            print("✅ GOOD! You have multiple models to compare!")
+            logger.info("✅ GOOD! You have multiple models to compare!")
         else:
-            print("⚠️  Limited functionality - add more API keys")
+            logger.warning("⚠️  Limited functionality - add more API keys")
         
         return working_keys > 0
     
+    @property
+    def clients(self) -> Dict[str, Any]:
+        """Clients built so far per provider (read-only view of the key pools)"""
+        
+        return {name: pool.client for name, pool in self._pools.items() if pool.client is not None}
+    
+    def _make_openai_client(self, key: str):
+        """Build an OpenAI client for one key"""
+        
+        from openai import OpenAI
+        return OpenAI(api_key=key)
+    
+    def _make_claude_client(self, key: str):
+        """Build an Anthropic client for one key"""
+        
+        import anthropic
+        return anthropic.Anthropic(api_key=key)
+    
+    def _make_google_model(self, key: str):
+        """Point the Gemini SDK at one key and build the active model"""
+        
+        import google.generativeai as genai
+        genai.configure(api_key=key)
+        return genai.GenerativeModel(self.active_google_model)
+    
+    def _make_llama_session(self, key: str):
+        """Build a pooled keep-alive HTTP session for one Llama key"""
+        
+        # Reuse TCP/TLS connections across calls and retry transient server
+        # failures. 429 is left to the KeyPool, which rotates to another key
+        # instead of sleeping on a throttled one. Read errors are not retried:
+        # the server may already be generating, and a resend is billed twice.
+        retry = Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {key}"
+        })
+        return session
+    
     def setup_openai_client(self):
         """Setup OpenAI client"""
         
-        if not self.openai_key or self.openai_key == "your-openai-key-here":
-            print("⚠️  OpenAI key not configured")
+        if not self._pools['openai']:
+            logger.warning("⚠️  OpenAI key not configured")
             return False
         
-        try:
-            from openai import OpenAI
-            self.clients['openai'] = OpenAI(api_key=self.openai_key)
-            print("✅ OpenAI client initialized")
-            return True
-        except Exception as e:
-            print(f"❌ OpenAI setup failed: {str(e)[:75]}")
+        # The SDK itself is imported on the first OpenAI call
+        if importlib.util.find_spec('openai') is None:
+            logger.warning("❌ OpenAI setup failed: openai package not installed")
             return False
+        
+        self._pools['openai'].enabled = True
+        logger.info("✅ OpenAI client ready (loads on first use)")
+        return True
     
     def setup_claude_client(self):
         """Setup Claude (Anthropic) client with improved model handling"""
         
-        if not self.claude_key:
-            print("⚠️  Claude API key not configured")
+        if not self._pools['claude']:
+            logger.warning("⚠️  Claude API key not configured")
             return False
         
-        try:
-            import anthropic
-            self.clients['claude'] = anthropic.Anthropic(api_key=self.claude_key)
-            print("✅ Claude client initialized")
-            return True
-        except Exception as e:
-            print(f"❌ Claude setup failed: {str(e)[:75]}")
+        # The SDK itself is imported on the first Claude call
+        if importlib.util.find_spec('anthropic') is None:
+            logger.warning("❌ Claude setup failed: anthropic package not installed")
             return False
+        
+        self._pools['claude'].enabled = True
+        logger.info("✅ Claude client ready (loads on first use)")
+        return True
     
     def setup_google_client(self):
-        """Setup Google client with multiple keys and model versions"""
+        """Setup Google client with multiple keys and model versions
+        
+        No test request is made here: the key/model pair is picked on the
+        first real call and remembered in GOOGLE_STATE_FILE.
+        """
         
-        if not self.google_keys:
-            print("⚠️  No Google keys available")
+        pool = self._pools['google']
+        if not pool:
+            logger.warning("⚠️  No Google keys available")
             return False
         
-        # Import Google AI library
+        # find_spec raises rather than returning None when the google
+        # namespace package itself is missing
         try:
-            import google.generativeai as genai
-        except ImportError:
-            print("❌ Google AI library not available")
+            installed = importlib.util.find_spec('google.generativeai') is not None
+        except ModuleNotFoundError:
+            installed = False
+        if not installed:
+            logger.warning("❌ Google AI library not available")
             return False
         
-        # Try different model names
-        model_names_to_try = [
-            'gemini-1.5-pro-latest',
-            'gemini-1.5-pro', 
-            'gemini-pro',
-            'gemini-1.0-pro'
-        ]
+        # Reuse the key/model pair that worked last time, if it still applies
+        saved = self._load_google_choice()
+        for entry in pool.entries:
+            if saved and self._key_fingerprint(entry["key"]) == saved.get("key_id"):
+                self.active_google_model = saved.get("model")
+                # Fill-first rotation will start from the known-good key
+                pool.entries.sort(key=lambda e: e is not entry)
+                break
         
-        # Try each key with each model name
-        for key_idx, key in enumerate(self.google_keys):
-            for model_name in model_names_to_try:
-                try:
-                    genai.configure(api_key=key)
-                    model = genai.GenerativeModel(model_name)
-                    
-                    # Test with minimal request
-                    test_response = model.generate_content(
-                        "Hi", generation_config={'max_output_tokens': 5}
-                    )
-                    
-                    # Success!
-                    self.active_google_key = key
-                    self.active_google_model = model_name
-                    self.clients['google'] = model
-                    key_name = f"Key #{key_idx+1}" if key_idx > 0 else "Primary"
-                    print(f"✅ Google Gemini ready ({key_name} key, model: {model_name})")
-                    return True
+        pool.enabled = True
+        if self.active_google_model:
+            logger.info("✅ Google Gemini ready (model: %s)", self.active_google_model)
+        else:
+            logger.info("✅ Google Gemini ready (model selected on first use)")
+        return True
+    
+    @staticmethod
+    def _key_fingerprint(key: str) -> str:
+        """Stable non-reversible identifier for an API key"""
+        
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    
+    def _load_google_choice(self) -> Optional[Dict[str, str]]:
+        """Read the cached working Google key/model pair"""
+        
+        try:
+            with open(GOOGLE_STATE_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_google_choice(self, key: str, model_name: str):
+        """Persist the working Google key/model pair for the next run"""
+        
+        try:
+            GOOGLE_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = GOOGLE_STATE_FILE.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key_id": self._key_fingerprint(key), "model": model_name}, f)
+            os.replace(tmp_path, GOOGLE_STATE_FILE)
+        except OSError:
+            pass  # The cache is only an optimisation
+    
+    def _forget_google_choice(self):
+        """Drop the cached Google key/model pair once it stops working"""
+        
+        try:
+            os.remove(GOOGLE_STATE_FILE)
+        except OSError:
+            pass
+    
+    def _discover_google_model(self, generate: Callable[[Any], Any]) -> Any:
+        """Run the first Gemini request across key/model pairs until one works"""
+        
+        from google.api_core import exceptions as google_exceptions
+        
+        pool = self._pools['google']
+        
+        with self._google_discovery_lock:
+            # Another thread may have finished discovery while we waited
+            if self.active_google_model is not None:
+                return pool.execute_with_failover(generate)
+            
+            tried = []
+            last_error = None
+            found = False
+            try:
+                entry = pool.next_available()
+                while entry is not None:
+                    for model_name in GOOGLE_MODEL_NAMES:
+                        self.active_google_model = model_name
+                        try:
+                            response = generate(pool.activate(entry))
+                        except Exception as e:
+                            status = _error_status(e)
+                            if _is_failover_status(status):
+                                # Rejected, throttled or failing: no model will
+                                # work with this key right now
+                                pool.fail(entry, e, status)
+                                last_error = e
+                                break
+                            if isinstance(e, (google_exceptions.NotFound,
+                                              google_exceptions.InvalidArgument)):
+                                last_error = e
+                                continue
+                            raise
+                        
+                        self._save_google_choice(entry["key"], model_name)
+                        found = True
+                        return response
                     
-                except Exception as e:
-                    # Try next combination
-                    continue
+                    tried.append(entry)
+                    entry = pool.next_available(tried)
+            finally:
+                # Never leave an unvalidated model behind
+                if not found:
+                    self.active_google_model = None
+            
+            self._forget_google_choice()
+            raise last_error or KeyPoolExhausted("No usable google API keys")
+    
+    def _run_google(self, generate: Callable[[Any], Any]) -> Any:
+        """Run a Gemini call on the remembered key/model, recovering if either goes bad
         
-        print("❌ All Google key/model combinations failed")
-        return False
+        Rejected keys (including Gemini's 400 "API key not valid/expired")
+        fail over to the backup keys, and the new working key is remembered.
+        A retired model triggers a fresh key/model discovery.
+        """
+        
+        from google.api_core import exceptions as google_exceptions
+        
+        pool = self._pools['google']
+        if self.active_google_model is not None:
+            first_choice = pool.next_available()
+            try:
+                response = pool.execute_with_failover(generate)
+            except google_exceptions.NotFound:
+                # The remembered model was retired; pick a new one
+                self.active_google_model = None
+            except Exception as e:
+                if _error_status(e) in KEY_REJECTED_STATUSES:
+                    self._forget_google_choice()
+                raise
+            else:
+                if pool.active is not first_choice:
+                    # The remembered key was refused; a backup key answered
+                    self._save_google_choice(pool.active["key"], self.active_google_model)
+                return response
+        
+        return self._discover_google_model(generate)
+    
+    def setup_llama_client(self):
+        """Setup a pooled keep-alive HTTP session for Llama"""
+        
+        if not self._pools['llama']:
+            logger.warning("⚠️  Llama key not configured")
+            return False
+        
+        self._pools['llama'].enabled = True
+        logger.info("✅ Llama session ready (HTTP keep-alive)")
+        return True
     
     def setup_all_clients(self):
         """Setup all available API clients"""
         
-        print("\n🔧 Initializing Enhanced AI Clients:")
-        print("-" * 45)
+        logger.info("\n🔧 Initializing Enhanced AI Clients:")
+        logger.info("-" * 45)
         
-        # Setup each service
+        # The setups make no network calls (SDK lookups, cached Google state),
+        # so they run in order and report their status in a fixed order
         self.setup_openai_client()
         self.setup_claude_client()
         self.setup_google_client()
-        
-        # Llama uses HTTP requests, so just check key
-        if self.llama_key:
-            print("✅ Llama key configured (HTTP-based)")
-        else:
-            print("⚠️  Llama key not configured")
+        self.setup_llama_client()
     
     def display_platform_status(self):
         """Display the final platform status"""
         
         available_models = []
-        if 'openai' in self.clients:
+        if self._pools['openai'].enabled:
             available_models.append("OpenAI GPT-4/3.5")
-        if 'claude' in self.clients:
+        if self._pools['claude'].enabled:
             available_models.append("Claude Sonnet")
-        if 'google' in self.clients:
-            available_models.append(f"Google Gemini ({self.active_google_model})")
-        if self.llama_key:
+        if self._pools['google'].enabled:
+            available_models.append(f"Google Gemini ({self.active_google_model or 'auto-select'})")
+        if self._pools['llama'].enabled:
             available_models.append("Meta Llama")
         
-        print(f"\n🚀 ENHANCED PLATFORM READY!")
-        print(f"Available Models: {len(available_models)}/4")
+        logger.info("\n🚀 ENHANCED PLATFORM READY!")
+        logger.info("Available Models: %s/4", len(available_models))
         for model in available_models:
-            print(f"   🤖 {model}")
+            logger.info("   🤖 %s", model)
         
         if len(available_models) >= 3:
-            print("\n🎉 ENHANCED ULTIMATE SETUP COMPLETE!")
-            print("You have access to the best AI models for prompt engineering!")
+            logger.info("\n🎉 ENHANCED ULTIMATE SETUP COMPLETE!")
+            logger.info("You have access to the best AI models for prompt engineering!")
         elif len(available_models) >= 2:
-            print(f"\n✅ GREAT ENHANCED SETUP!")
-            print("You can run comprehensive model comparisons!")
+            logger.info("\n✅ GREAT ENHANCED SETUP!")
+            logger.info("You can run comprehensive model comparisons!")
         elif len(available_models) >= 1:
-            print(f"\n✅ BASIC ENHANCED SETUP READY!")
-            print("You can start prompt engineering experiments!")
+            logger.info("\n✅ BASIC ENHANCED SETUP READY!")
+            logger.info("You can start prompt engineering experiments!")
         else:
-            print(f"\n⚠️  No models available. Please check your API keys.")
+            logger.warning("\n⚠️  No models available. Please check your API keys.")
+    
+    def _cache_get(self, key):
+        """Look up a cached response in memory, then on disk"""
+        
+        response = self._cache.get(key)
+        if response is None and self._disk_cache is not None:
+            response = self._disk_cache.get(key)
+            if response is not None:
+                self._cache[key] = response
+        return response
+    
+    def _cache_set(self, key, response: str):
+        """Store a successful response in memory and on disk"""
+        
+        self._cache[key] = response
+        if self._disk_cache is not None:
+            self._disk_cache[key] = response
+    
+    def _system_messages(self, system_prompt: Optional[str]) -> Tuple[Dict[str, str], ...]:
+        """Chat-message prefix for a system prompt, shared across calls
+        
+        Keeping the system message byte-identical and first in every request
+        lets OpenAI-compatible APIs reuse their cached prefix.
+        """
+        
+        key = ("chat", system_prompt)
+        prefix = self._prefix_cache.get(key)
+        if prefix is None:
+            prefix = ({"role": "system", "content": system_prompt},) if system_prompt else ()
+            self._prefix_cache[key] = prefix
+        return prefix
+    
+    def _claude_system(self, system_prompt: str) -> List[Dict[str, Any]]:
+        """Claude system blocks marked for prompt caching
+        
+        Anthropic caches prompts of 1024+ tokens marked ``ephemeral``, so a
+        long system prompt reused across a comparison is only billed at the
+        full prefill rate once. Shorter prompts are simply not cached.
+        """
+        
+        key = ("claude", system_prompt)
+        blocks = self._prefix_cache.get(key)
+        if blocks is None:
+            blocks = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+            self._prefix_cache[key] = blocks
+        return blocks
+    
+    def _check_prompt_length(self, model: Optional[str], prompt: str, system_prompt: Optional[str]) -> Optional[str]:
+        """Return an error if the prompt cannot fit the model's context window
+        
+        Tokens are counted locally with tiktoken's cl100k_base encoding, which
+        is exact for OpenAI and a close estimate for the other providers.
+        """
+        
+        limit = MODEL_CONTEXT_TOKENS.get(model)
+        if limit is None:
+            return None
+        budget = limit - MAX_OUTPUT_TOKENS
+        
+        # A token is at least one UTF-8 byte, so short prompts can't overflow
+        if 4 * (len(prompt) + len(system_prompt or "")) <= budget:
+            return None
+        
+        if self._encoding is None:
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                self._encoding = False
+        if self._encoding is False:
+            return None
+        
+        n_tokens = len(self._encoding.encode(prompt))
+        if system_prompt:
+            n_tokens += len(self._encoding.encode(system_prompt))
+        if n_tokens > budget:
+            return f"❌ Prompt too long for {model} ({n_tokens} tokens, limit {budget})"
+        return None
     
     # Model-specific response methods with improved error handling
+    @cached_response("openai")
     def get_openai_response(self, prompt: str, system_prompt: Optional[str] = None, model: str = "gpt-4") -> str:
         """Get response from OpenAI"""
         
-        if 'openai' not in self.clients:
+        pool = self._pools['openai']
+        if not pool.enabled:
             return "❌ OpenAI not available"
         
+        too_long = self._check_prompt_length(model, prompt, system_prompt)
+        if too_long:
+            return too_long
+        
         try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+            messages = [*self._system_messages(system_prompt), {"role": "user", "content": prompt}]
             
-            response = self.clients['openai'].chat.completions.create(
+            response = pool.execute_with_failover(lambda client: client.chat.completions.create(
                 model=model,
                 messages=messages,
-                max_tokens=400,
+                max_tokens=MAX_OUTPUT_TOKENS,
                 temperature=0.7
-            )
+            ))
             return response.choices[0].message.content
         except Exception as e:
             return f"❌ OpenAI Error: {str(e)[:100]}"
     
+    @cached_response("claude")
     def get_claude_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Get response from Claude with updated model"""
         
-        if 'claude' not in self.clients:
+        pool = self._pools['claude']
+        if not pool.enabled:
             return "❌ Claude not available"
         
+        too_long = self._check_prompt_length(CLAUDE_MODEL, prompt, system_prompt)
+        if too_long:
+            return too_long
+        
         try:
             # Use the latest stable Claude model
             messages = [{"role": "user", "content": prompt}]
             
             kwargs = {
-                "model": "claude-3-5-sonnet-20241022",  # Updated model
-                "max_tokens": 400,
+                "model": CLAUDE_MODEL,  # Updated model
+                "max_tokens": MAX_OUTPUT_TOKENS,
                 "temperature": 0.7,
                 "messages": messages
             }
             
             if system_prompt:
-                kwargs["system"] = system_prompt
+                kwargs["system"] = self._claude_system(system_prompt)
             
-            response = self.clients['claude'].messages.create(**kwargs)
+            response = pool.execute_with_failover(lambda client: client.messages.create(**kwargs))
             return response.content[0].text
             
         except Exception as e:
@@ -309,162 +1028,728 @@ class ImprovedUltimate4ModelPlatform:
             else:
                 return f"❌ Claude Error: {error_msg[:100]}"
     
+    def _llama_payload(self, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """Build the JSON body for a Llama chat completion"""
+        
+        messages = [*self._system_messages(system_prompt), {"role": "user", "content": prompt}]
+        
+        return {
+            "model": LLAMA_MODEL,
+            "messages": messages,
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "temperature": 0.7
+        }
+    
+    @staticmethod
+    def _parse_llama_result(result: Dict[str, Any]) -> str:
+        """Extract the completion text from a Llama API response body"""
+        
+        # Chat responses carry message.content, completion-style ones text
+        try:
+            choice = result["choices"][0]
+        except (KeyError, IndexError, TypeError):
+            return "❌ Unexpected Llama response format"
+        return (
+            (choice.get("message") or {}).get("content")
+            or choice.get("text")
+            or "❌ Unexpected Llama response format"
+        )
+    
+    @cached_response("llama")
     def get_llama_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Get response from Llama with improved error handling"""
         
-        if not self.llama_key:
+        pool = self._pools['llama']
+        if not pool.enabled:
             return "❌ Llama not available"
         
+        too_long = self._check_prompt_length(LLAMA_MODEL, prompt, system_prompt)
+        if too_long:
+            return too_long
+        
         try:
-            url = "https://api.llama.com/v1/chat/completions"
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.llama_key}"
-            }
+            body = _json_dumps(self._llama_payload(prompt, system_prompt))
             
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            
-            data = {
-                "model": "Llama-4-Maverick-17B-128E-Instruct-FP8",
-                "messages": messages,
-                "max_tokens": 400,
-                "temperature": 0.7
-            }
+            def post(session):
+                response = session.post(LLAMA_API_URL, data=body, timeout=60)
+                # Let the key pool fail over on auth, quota and server errors
+                if _is_failover_status(response.status_code):
+                    response.raise_for_status()
+                return response
             
-            response = requests.post(url, headers=headers, json=data, timeout=60)
+            response = pool.execute_with_failover(post)
             
             if response.status_code == 200:
-                result = response.json()
-                # Improved parsing to handle different response formats
-                if 'choices' in result and len(result['choices']) > 0:
-                    if 'message' in result['choices'][0]:
-                        return result['choices'][0]['message']['content']
-                    elif 'text' in result['choices'][0]:
-                        return result['choices'][0]['text']
-                return "❌ Unexpected Llama response format"
+                return self._parse_llama_result(_json_loads(response.content))
             else:
                 return f"❌ Llama API Error: {response.status_code}"
                 
+        except requests.HTTPError as e:
+            return f"❌ Llama API Error: {e.response.status_code}"
         except Exception as e:
             return f"❌ Llama Error: {str(e)[:100]}"
     
+    async def _llama_async_client(self):
+        """Return the shared httpx client for the running event loop
+        
+        HTTP/2 is used when the ``h2`` package is installed, letting
+        concurrent Llama calls share one connection. A client left over
+        from another event loop is closed and replaced. Raises ImportError
+        when httpx is missing.
+        """
+        
+        import httpx
+        
+        loop = asyncio.get_running_loop()
+        if self._llama_async is None or self._llama_async_loop is not loop:
+            old_client, old_loop = self._llama_async, self._llama_async_loop
+            self._llama_async = httpx.AsyncClient(
+                http2=importlib.util.find_spec('h2') is not None,
+                timeout=60.0,
+                headers={"Content-Type": "application/json"}
+            )
+            self._llama_async_loop = loop
+            if old_client is not None:
+                await self._close_async_client(old_client, old_loop)
+        return self._llama_async
+    
+    @staticmethod
+    async def _close_async_client(client, loop):
+        """Close an httpx client, on the loop that owns it when that is still running"""
+        
+        if loop is not asyncio.get_running_loop() and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        
+        try:
+            await client.aclose()
+        except RuntimeError:
+            pass  # Its loop is closed; the sockets go when the client is collected
+    
+    async def aclose(self):
+        """Close the async Llama client; await before the event loop shuts down"""
+        
+        client, loop = self._llama_async, self._llama_async_loop
+        self._llama_async = None
+        self._llama_async_loop = None
+        if client is not None:
+            await self._close_async_client(client, loop)
+    
+    async def get_llama_response_async(self, prompt: str, system_prompt: Optional[str] = None,
+                                       no_cache: bool = False) -> str:
+        """Get response from Llama without blocking the event loop"""
+        
+        pool = self._pools['llama']
+        if not pool.enabled:
+            return "❌ Llama not available"
+        
+        too_long = self._check_prompt_length(LLAMA_MODEL, prompt, system_prompt)
+        if too_long:
+            return too_long
+        
+        try:
+            client = await self._llama_async_client()
+        except ImportError:
+            # No httpx: run the pooled requests session on a worker thread
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, functools.partial(
+                self.get_llama_response, prompt, system_prompt, no_cache=no_cache
+            ))
+        
+        # Same key layout as @cached_response("llama") on the sync method
+        cache_key = ("llama", prompt, system_prompt)
+        if not no_cache:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
+        body = _json_dumps(self._llama_payload(prompt, system_prompt))
+        
+        async def post(api_key):
+            response = await client.post(
+                LLAMA_API_URL, content=body, headers={"Authorization": f"Bearer {api_key}"}
+            )
+            if _is_failover_status(response.status_code):
+                response.raise_for_status()
+            return response
+        
+        try:
+            response = await pool.execute_with_failover_async(post)
+            if response.status_code == 200:
+                result = self._parse_llama_result(_json_loads(response.content))
+            else:
+                result = f"❌ Llama API Error: {response.status_code}"
+        except Exception as e:
+            status = _error_status(e)
+            result = f"❌ Llama API Error: {status}" if status else f"❌ Llama Error: {str(e)[:100]}"
+        
+        if not result.startswith("❌"):
+            self._cache_set(cache_key, result)
+        return result
+    
+    @cached_response("google")
     def get_google_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Get response from Google Gemini"""
         
-        if 'google' not in self.clients:
+        pool = self._pools['google']
+        if not pool.enabled:
             return "❌ Google not available"
         
+        too_long = self._check_prompt_length(self.active_google_model, prompt, system_prompt)
+        if too_long:
+            return too_long
+        
         try:
             # Combine system and user prompt for Gemini
             full_prompt = prompt
             if system_prompt:
                 full_prompt = f"Instructions: {system_prompt}\n\nUser: {prompt}"
             
-            response = self.clients['google'].generate_content(
-                full_prompt,
-                generation_config={
-                    'max_output_tokens': 400,
-                    'temperature': 0.7
-                }
-            )
-            return response.text
+            def generate(model):
+                return model.generate_content(
+                    full_prompt,
+                    generation_config={
+                        'max_output_tokens': MAX_OUTPUT_TOKENS,
+                        'temperature': 0.7
+                    }
+                )
+            
+            return self._run_google(generate).text
         except Exception as e:
             return f"❌ Google Error: {str(e)[:100]}"
     
+    # Streaming variants: yield text chunks as they arrive
+    @cached_stream("openai")
+    def get_openai_response_stream(self, prompt: str, system_prompt: Optional[str] = None, model: str = "gpt-4") -> Iterator[str]:
+        """Stream a response from OpenAI"""
+        
+        pool = self._pools['openai']
+        if not pool.enabled:
+            yield "❌ OpenAI not available"
+            return
+        
+        too_long = self._check_prompt_length(model, prompt, system_prompt)
+        if too_long:
+            yield too_long
+            return
+        
+        try:
+            messages = [*self._system_messages(system_prompt), {"role": "user", "content": prompt}]
+            
+            stream = pool.execute_with_failover(lambda client: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                temperature=0.7,
+                stream=True
+            ))
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            yield f"❌ OpenAI Error: {str(e)[:100]}"
+    
+    @cached_stream("claude")
+    def get_claude_response_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream a response from Claude"""
+        
+        pool = self._pools['claude']
+        if not pool.enabled:
+            yield "❌ Claude not available"
+            return
+        
+        too_long = self._check_prompt_length(CLAUDE_MODEL, prompt, system_prompt)
+        if too_long:
+            yield too_long
+            return
+        
+        try:
+            kwargs = {
+                "model": CLAUDE_MODEL,
+                "max_tokens": MAX_OUTPUT_TOKENS,
+                "temperature": 0.7,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": True
+            }
+            
+            if system_prompt:
+                kwargs["system"] = self._claude_system(system_prompt)
+            
+            # create(stream=True) raises on HTTP errors up front, so the key
+            # pool can still fail over before any text is yielded
+            stream = pool.execute_with_failover(lambda client: client.messages.create(**kwargs))
+            for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield event.delta.text
+        except Exception as e:
+            error_msg = str(e)
+            if "overloaded" in error_msg.lower():
+                yield "❌ Claude temporarily overloaded - try again in a moment"
+            else:
+                yield f"❌ Claude Error: {error_msg[:100]}"
+    
+    @cached_stream("llama")
+    def get_llama_response_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream a response from Llama over server-sent events"""
+        
+        pool = self._pools['llama']
+        if not pool.enabled:
+            yield "❌ Llama not available"
+            return
+        
+        too_long = self._check_prompt_length(LLAMA_MODEL, prompt, system_prompt)
+        if too_long:
+            yield too_long
+            return
+        
+        try:
+            body = _json_dumps(dict(self._llama_payload(prompt, system_prompt), stream=True))
+            
+            def post(session):
+                response = session.post(LLAMA_API_URL, data=body, timeout=60, stream=True)
+                if _is_failover_status(response.status_code):
+                    response.raise_for_status()
+                return response
+            
+            response = pool.execute_with_failover(post)
+            if response.status_code != 200:
+                yield f"❌ Llama API Error: {response.status_code}"
+                return
+            
+            with response:
+                for line in response.iter_lines():
+                    if not line.startswith(b"data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == b"[DONE]":
+                        break
+                    
+                    choice = (_json_loads(payload).get("choices") or [{}])[0]
+                    text = (choice.get("delta") or {}).get("content") or choice.get("text")
+                    if text:
+                        yield text
+        except requests.HTTPError as e:
+            yield f"❌ Llama API Error: {e.response.status_code}"
+        except Exception as e:
+            yield f"❌ Llama Error: {str(e)[:100]}"
+    
+    @cached_stream("google")
+    def get_google_response_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream a response from Google Gemini"""
+        
+        pool = self._pools['google']
+        if not pool.enabled:
+            yield "❌ Google not available"
+            return
+        
+        too_long = self._check_prompt_length(self.active_google_model, prompt, system_prompt)
+        if too_long:
+            yield too_long
+            return
+        
+        try:
+            full_prompt = prompt
+            if system_prompt:
+                full_prompt = f"Instructions: {system_prompt}\n\nUser: {prompt}"
+            
+            def generate(model):
+                return model.generate_content(
+                    full_prompt,
+                    generation_config={
+                        'max_output_tokens': MAX_OUTPUT_TOKENS,
+                        'temperature': 0.7
+                    },
+                    stream=True
+                )
+            
+            for chunk in self._run_google(generate):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            yield f"❌ Google Error: {str(e)[:100]}"
+    
+    def _map_prompts(self, response_func, prompts: List[str], system_prompt: Optional[str] = None) -> List[str]:
+        """Run one provider over many prompts concurrently, preserving order"""
+        
+        if not prompts:
+            return []
+        
+        workers = min(len(prompts), BATCH_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(response_func, p, system_prompt) for p in prompts]
+            return [future.result() for future in futures]
+    
+    def get_openai_responses_batch(self, prompts: List[str], system_prompt: Optional[str] = None, model: str = "gpt-4") -> List[str]:
+        """Get OpenAI responses for many prompts with as few requests as possible"""
+        
+        pool = self._pools['openai']
+        if not pool.enabled:
+            return ["❌ OpenAI not available"] * len(prompts)
+        
+        # Chat models take one conversation per request, so fan out instead
+        if model not in OPENAI_COMPLETION_MODELS:
+            return self._map_prompts(
+                lambda p, sp: self.get_openai_response(p, sp, model=model),
+                prompts, system_prompt
+            )
+        
+        try:
+            if system_prompt:
+                batch = [f"{system_prompt}\n\n{p}" for p in prompts]
+            else:
+                batch = list(prompts)
+            
+            response = pool.execute_with_failover(lambda client: client.completions.create(
+                model=model,
+                prompt=batch,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                temperature=0.7
+            ))
+            
+            # Choices are not guaranteed to come back in prompt order
+            results = [""] * len(prompts)
+            for choice in response.choices:
+                results[choice.index] = choice.text
+            return results
+        except Exception as e:
+            return [f"❌ OpenAI Error: {str(e)[:100]}"] * len(prompts)
+    
+    def submit_batch(self, prompts: List[str], provider: str = "openai", system_prompt: Optional[str] = None,
+                     poll_interval: float = BATCH_POLL_INTERVAL) -> List[str]:
+        """Run prompts through the provider's asynchronous Batch API
+        
+        Batch jobs are billed at half the synchronous price and have much
+        higher rate limits, but can take minutes to hours to finish. Use this
+        for offline evaluations; it blocks until the batch completes.
+        """
+        
+        if provider == "openai":
+            return self._submit_openai_batch(prompts, system_prompt, poll_interval)
+        elif provider == "claude":
+            return self._submit_claude_batch(prompts, system_prompt, poll_interval)
+        raise ValueError(f"Batch API not supported for provider: {provider}")
+    
+    def _submit_openai_batch(self, prompts: List[str], system_prompt: Optional[str], poll_interval: float,
+                             model: str = "gpt-4") -> List[str]:
+        """Submit an OpenAI batch job and wait for its results"""
+        
+        pool = self._pools['openai']
+        if not pool.enabled:
+            return ["❌ OpenAI not available"] * len(prompts)
+        
+        try:
+            # A batch job lives under one key from upload to download
+            _, client = pool.acquire()
+            if client is None:
+                raise KeyPoolExhausted("No usable openai API keys")
+            
+            lines = []
+            for idx, prompt in enumerate(prompts):
+                messages = [*self._system_messages(system_prompt), {"role": "user", "content": prompt}]
+                
+                lines.append(json.dumps({
+                    "custom_id": str(idx),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": model,
+                        "messages": messages,
+                        "max_tokens": MAX_OUTPUT_TOKENS,
+                        "temperature": 0.7
+                    }
+                }))
+            
+            batch_file = client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                time.sleep(poll_interval)
+                batch = client.batches.retrieve(batch.id)
+            
+            if batch.status != "completed" or not batch.output_file_id:
+                return [f"❌ OpenAI batch {batch.status}"] * len(prompts)
+            
+            results = ["❌ OpenAI batch request failed"] * len(prompts)
+            output = client.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    results[int(record["custom_id"])] = content
+            return results
+        except Exception as e:
+            return [f"❌ OpenAI Batch Error: {str(e)[:100]}"] * len(prompts)
+    
+    def _submit_claude_batch(self, prompts: List[str], system_prompt: Optional[str], poll_interval: float) -> List[str]:
+        """Submit a Claude message batch and wait for its results"""
+        
+        pool = self._pools['claude']
+        if not pool.enabled:
+            return ["❌ Claude not available"] * len(prompts)
+        
+        try:
+            # A batch job lives under one key from submission to results
+            _, client = pool.acquire()
+            if client is None:
+                raise KeyPoolExhausted("No usable claude API keys")
+            batches = client.messages.batches
+            
+            requests_list = []
+            for idx, prompt in enumerate(prompts):
+                params = {
+                    "model": CLAUDE_MODEL,
+                    "max_tokens": MAX_OUTPUT_TOKENS,
+                    "temperature": 0.7,
+                    "messages": [{"role": "user", "content": prompt}]
+                }
+                if system_prompt:
+                    params["system"] = self._claude_system(system_prompt)
+                requests_list.append({"custom_id": str(idx), "params": params})
+            
+            batch = batches.create(requests=requests_list)
+            
+            while batch.processing_status != "ended":
+                time.sleep(poll_interval)
+                batch = batches.retrieve(batch.id)
+            
+            results = ["❌ Claude batch request failed"] * len(prompts)
+            for entry in batches.results(batch.id):
+                if entry.result.type == "succeeded":
+                    results[int(entry.custom_id)] = entry.result.message.content[0].text
+                else:
+                    results[int(entry.custom_id)] = f"❌ Claude batch request {entry.result.type}"
+            return results
+        except Exception as e:
+            return [f"❌ Claude Batch Error: {str(e)[:100]}"] * len(prompts)
+    
     def run_enhanced_4model_test(self):
         """Test all 4 AI model connections with enhanced error handling"""
         
-        print("\n🧪 ENHANCED 4-MODEL CONNECTION TEST")
-        print("=" * 55)
+        logger.info("\n🧪 ENHANCED 4-MODEL CONNECTION TEST")
+        logger.info("=" * 55)
         
         test_prompt = "Hello! Respond with just 'Connection successful!' to test."
         
-        models = {
-            "OpenAI GPT-4": lambda: self.get_openai_response(test_prompt),
-            "Claude Sonnet": lambda: self.get_claude_response(test_prompt),
-            "Google Gemini": lambda: self.get_google_response(test_prompt),
-            "Meta Llama": lambda: self.get_llama_response(test_prompt)
-        }
-        
         working_models = []
         
-        for model_name, test_func in models.items():
-            print(f"\n🔄 Testing {model_name}...")
-            
-            result = test_func()
+        # Submit every test first so the network round-trips overlap,
+        # then collect results in the original model order. A connection
+        # test must reach the API, so the response cache is bypassed.
+        with ThreadPoolExecutor(max_workers=max(1, len(self._dispatch))) as executor:
+            futures = {
+                TEST_LABELS[name]: executor.submit(func, test_prompt, no_cache=True)
+                for name, func in self._dispatch
+            }
             
-            if not result.startswith("❌"):
-                print(f"✅ {model_name}: SUCCESS")
-                print(f"   Response: {result[:60]}...")
-                working_models.append(model_name)
-            else:
-                print(f"❌ {model_name}: FAILED")
-                print(f"   Error: {result[:80]}")
+            for model_name, future in futures.items():
+                logger.info("\n🔄 Testing %s...", model_name)
+                
+                result = future.result()
+                
+                if not result.startswith("❌"):
+                    logger.info("✅ %s: SUCCESS", model_name)
+                    logger.info("   Response: %s...", result[:60])
+                    working_models.append(model_name)
+                else:
+                    logger.warning("❌ %s: FAILED", model_name)
+                    logger.warning("   Error: %s", result[:80])
         
         # Enhanced summary
-        print(f"\n📊 ENHANCED CONNECTION TEST RESULTS:")
-        print(f"✅ Working models: {len(working_models)}/4")
+        logger.info("\n📊 ENHANCED CONNECTION TEST RESULTS:")
+        logger.info("✅ Working models: %s/4", len(working_models))
         
         if len(working_models) == 4:
-            print("🎉 PERFECT! All 4 AI providers are working!")
-            print("You have the ultimate prompt engineering setup!")
+            logger.info("🎉 PERFECT! All 4 AI providers are working!")
+            logger.info("You have the ultimate prompt engineering setup!")
         elif len(working_models) >= 3:
-            print(f"🔥 EXCELLENT! {len(working_models)} models working!")
-            print("You can run comprehensive model comparisons!")
+            logger.info("🔥 EXCELLENT! %s models working!", len(working_models))
+            logger.info("You can run comprehensive model comparisons!")
         elif len(working_models) >= 2:
-            print(f"✅ GOOD! {len(working_models)} models working!")
-            print("You can run effective model comparisons!")
+            logger.info("✅ GOOD! %s models working!", len(working_models))
+            logger.info("You can run effective model comparisons!")
         elif len(working_models) == 1:
-            print("✅ BASIC! 1 model working - you can start experimenting!")
+            logger.info("✅ BASIC! 1 model working - you can start experimenting!")
         else:
-            print("⚠️  No models working. Please check your API keys.")
+            logger.warning("⚠️  No models working. Please check your API keys.")
         
         return working_models
     
     def compare_all_models_enhanced(self, prompt: str, system_prompt: Optional[str] = None, title: str = "🌟 Enhanced 4-Model Comparison"):
         """Enhanced comparison across all 4 AI models"""
         
-        print(f"\n{title}")
-        print(f"Prompt: {prompt}")
+        logger.info("\n%s", title)
+        logger.info("Prompt: %s", prompt)
         if system_prompt:
-            print(f"System: {system_prompt}")
-        print("=" * 80)
-        
-        models = {
-            "🧠 OpenAI GPT-4": lambda: self.get_openai_response(prompt, system_prompt),
-            "🎭 Claude Sonnet": lambda: self.get_claude_response(prompt, system_prompt),
-            "🔍 Google Gemini": lambda: self.get_google_response(prompt, system_prompt),
-            "🦙 Meta Llama": lambda: self.get_llama_response(prompt, system_prompt)
-        }
+            logger.info("System: %s", system_prompt)
+        logger.info("=" * 80)
         
         results = {}
         
-        for model_name, model_func in models.items():
-            print(f"\n{model_name}:")
-            print("-" * 55)
+        # Query all providers concurrently; wall time is the slowest model
+        # instead of the sum of all four
+        with ThreadPoolExecutor(max_workers=max(1, len(self._dispatch))) as executor:
+            futures = {
+                COMPARE_LABELS[name]: executor.submit(func, prompt, system_prompt)
+                for name, func in self._dispatch
+            }
+            
+            for model_name, future in futures.items():
+                logger.info("\n%s:", model_name)
+                logger.info("-" * 55)
+                
+                response = future.result()
+                logger.info("%s", response)
+                results[model_name] = response
+                logger.info("")
+        
+        return results
+    
+    def compare_all_models_batch(self, prompts: List[str], system_prompt: Optional[str] = None, title: str = "🌟 Enhanced 4-Model Batch Comparison", openai_model: str = "gpt-4"):
+        """Compare a list of prompts across all 4 AI models using batched calls
+        
+        With a completion model as openai_model (see OPENAI_COMPLETION_MODELS)
+        all prompts go to OpenAI in one request; chat models get one call each.
+        """
+        
+        logger.info("\n%s", title)
+        logger.info("Prompts: %s", len(prompts))
+        if system_prompt:
+            logger.info("System: %s", system_prompt)
+        logger.info("=" * 80)
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(self._dispatch))) as executor:
+            futures = {}
+            for name, func in self._dispatch:
+                if name == 'openai':
+                    future = executor.submit(self.get_openai_responses_batch, prompts, system_prompt, openai_model)
+                else:
+                    future = executor.submit(self._map_prompts, func, prompts, system_prompt)
+                futures[COMPARE_LABELS[name]] = future
+            responses = {name: future.result() for name, future in futures.items()}
+        
+        # One result dict per prompt, in the same order as the input
+        results = []
+        for idx, prompt in enumerate(prompts):
+            logger.info("\n📝 Prompt %s: %s", idx + 1, prompt)
+            logger.info("=" * 80)
             
-            response = model_func()
-            print(response)
+            prompt_results = {}
+            for model_name, model_responses in responses.items():
+                logger.info("\n%s:", model_name)
+                logger.info("-" * 55)
+                logger.info("%s", model_responses[idx])
+                prompt_results[model_name] = model_responses[idx]
+                logger.info("")
+            results.append(prompt_results)
+        
+        return results
+    
+    async def compare_all_models_async(self, prompt: str, system_prompt: Optional[str] = None, title: str = "🌟 Enhanced 4-Model Comparison"):
+        """Async comparison across all 4 AI models, for use inside an event loop
+        
+        In Jupyter: ``await platform.compare_all_models_async(prompt)``.
+        Llama runs natively on httpx; the SDK-based providers run on worker
+        threads, and everything is awaited together with asyncio.gather.
+        """
+        
+        logger.info("\n%s", title)
+        logger.info("Prompt: %s", prompt)
+        if system_prompt:
+            logger.info("System: %s", system_prompt)
+        logger.info("=" * 80)
+        
+        loop = asyncio.get_running_loop()
+        
+        def in_thread(response_func):
+            return loop.run_in_executor(None, response_func, prompt, system_prompt)
+        
+        tasks = {
+            COMPARE_LABELS[name]: (
+                self.get_llama_response_async(prompt, system_prompt) if name == 'llama'
+                else in_thread(func)
+            )
+            for name, func in self._dispatch
+        }
+        
+        responses = await asyncio.gather(*tasks.values())
+        
+        results = {}
+        for model_name, response in zip(tasks, responses):
+            logger.info("\n%s:", model_name)
+            logger.info("-" * 55)
+            logger.info("%s", response)
             results[model_name] = response
-            print()
+            logger.info("")
+        
+        return results
+    
+    def compare_all_models_stream(self, prompt: str, system_prompt: Optional[str] = None, title: str = "🌟 Enhanced 4-Model Comparison"):
+        """Comparison across all 4 AI models that prints text as it arrives
+        
+        All providers stream concurrently; the first one is printed live
+        while the others buffer, so the first words appear almost at once and
+        total wall time is still that of the slowest model.
+        """
+        
+        logger.info("\n%s", title)
+        logger.info("Prompt: %s", prompt)
+        if system_prompt:
+            logger.info("System: %s", system_prompt)
+        logger.info("=" * 80)
+        
+        def pump(stream_func, chunks):
+            try:
+                for chunk in stream_func(prompt, system_prompt):
+                    chunks.put(chunk)
+            finally:
+                chunks.put(None)
+        
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(self._stream_dispatch))) as executor:
+            queues = {}
+            for name, stream_func in self._stream_dispatch:
+                queues[COMPARE_LABELS[name]] = queue.Queue()
+                executor.submit(pump, stream_func, queues[COMPARE_LABELS[name]])
+            
+            # Headers are printed, not logged, so quiet mode never leaves
+            # the streamed answers unlabelled
+            for model_name, chunks in queues.items():
+                print(f"\n{model_name}:")
+                print("-" * 55)
+                
+                parts = []
+                chunk = chunks.get()
+                while chunk is not None:
+                    print(chunk, end="", flush=True)
+                    parts.append(chunk)
+                    chunk = chunks.get()
+                
+                results[model_name] = "".join(parts)
+                print("\n")
         
         return results
     
     def interactive_mode_enhanced(self):
         """Enhanced interactive prompt testing across 4 models"""
         
-        print("\n🎮 ENHANCED INTERACTIVE MODE")
-        print("=" * 55)
-        print("🌟 Test prompts across OpenAI, Claude, Gemini, and Llama!")
-        print()
-        print("Commands:")
-        print("  • Enter any prompt to test across all available models")
-        print("  • Type 'test' to rerun connection tests")
-        print("  • Type 'quit' to exit")
-        print("-" * 55)
+        logger.info("\n🎮 ENHANCED INTERACTIVE MODE")
+        logger.info("=" * 55)
+        logger.info("🌟 Test prompts across OpenAI, Claude, Gemini, and Llama!")
+        logger.info("")
+        logger.info("Commands:")
+        logger.info("  • Enter any prompt to test across all available models")
+        logger.info("  • Type 'test' to rerun connection tests")
+        logger.info("  • Type 'quit' to exit")
+        logger.info("-" * 55)
         
         while True:
             print(f"\n💭 Your prompt (or command): ")
@@ -473,8 +1758,8 @@ class ImprovedUltimate4ModelPlatform:
             if not user_input:
                 continue
             elif user_input.lower() == 'quit':
-                print("👋 Thanks for using the Enhanced Ultimate 4-Model Platform!")
-                print("🎓 You're now ready for advanced prompt engineering!")
+                logger.info("👋 Thanks for using the Enhanced Ultimate 4-Model Platform!")
+                logger.info("🎓 You're now ready for advanced prompt engineering!")
                 break
             elif user_input.lower() == 'test':
                 self.run_enhanced_4model_test()
@@ -485,8 +1770,8 @@ class ImprovedUltimate4ModelPlatform:
             system_input = input().strip()
             system_prompt = system_input if system_input else None
             
-            # Run enhanced 4-model comparison
-            self.compare_all_models_enhanced(user_input, system_prompt, "🎯 Your Enhanced Custom Test")
+            # Run enhanced 4-model comparison, streaming answers as they arrive
+            self.compare_all_models_stream(user_input, system_prompt, "🎯 Your Enhanced Custom Test")
 
 
 def main():